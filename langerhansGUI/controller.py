@@ -2,18 +2,23 @@ import os
 import numpy as np
 import yaml
 import pickle
-import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
+from matplotlib.figure import Figure
 import time
 
+from langerhansGUI.summary import DistributionSummary
+
 
 class Controller(object):
     """docstring for Controller."""
 
-    def __init__(self, data, view):
+    def __init__(self, data, view, drawing=True):
         self.data = data
         self.view = view
         self.analysis = False
+        self.summary = None
+        self.drawing = drawing
+        self.error = None
 
         self.view.register(self)
 
@@ -33,10 +38,12 @@ class Controller(object):
                 self.data.reset_computations()
             series = np.loadtxt(filename)
             self.data.import_data(series)
+            self.summary = None
             self.current_stage = "imported"
             self.draw_fig()
         except ValueError as e:
             print(e)
+            self.error = str(e)
 
     def import_settings(self):
         if self.current_stage == 0 or self.busy:
@@ -53,10 +60,12 @@ class Controller(object):
         try:
             self.data.import_settings(settings)
             self.data.reset_computations()
+            self.summary = None
             self.current_stage = "imported"
             self.draw_fig()
         except ValueError as e:
             print(e)
+            self.error = str(e)
 
     def import_excluded(self):
         if self.current_stage == 0 or self.busy:
@@ -70,6 +79,7 @@ class Controller(object):
             self.draw_fig()
         except ValueError as e:
             print(e)
+            self.error = str(e)
 
     def import_object(self):
         if self.busy:
@@ -82,6 +92,8 @@ class Controller(object):
                 self.data = pickle.load(input)
         except Exception as exc:
             print("Unsuccessful: {}.".format(exc))
+            self.error = str(exc)
+        self.summary = None
         self.current_stage = "imported"
         self.draw_fig()
 
@@ -108,8 +120,8 @@ class Controller(object):
         file = self.view.save_as("pdf")
         if file is None:
             return
-        self.__get_fig()
-        plt.savefig(file)
+        fig = self.get_fig(self.current_stage, self.current_number)
+        fig.savefig(file)
 
     def save_eventplot(self):
         if not self.data.is_analyzed():
@@ -117,7 +129,8 @@ class Controller(object):
         file = self.view.save_as("pdf")
         if file is None:
             return
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         checkpoint = 0.05
         for i in self.data.plot_events(ax):
             print(i)
@@ -164,18 +177,26 @@ class Controller(object):
                     if i > checkpoint:
                         checkpoint += 0.1
                         self.view.update()
-                self.busy = False
                 self.current_stage = "filtered"
                 self.draw_fig()
             except ValueError as e:
                 print(e)
+                self.error = str(e)
+            finally:
+                self.busy = False
 
     def distributions_click(self):
         if self.current_stage == 0 or self.busy:
             return
         elif self.data.get_distributions() is not False:
-            self.current_stage = "distributions"
-            self.draw_fig()
+            try:
+                if self.summary is None:
+                    self.summary = DistributionSummary(self.data)
+                self.current_stage = "distributions"
+                self.draw_fig()
+            except ValueError as e:
+                print(e)
+                self.error = str(e)
         else:
             try:
                 self.busy = True
@@ -185,11 +206,28 @@ class Controller(object):
                     if i > checkpoint:
                         checkpoint += 0.1
                         self.view.update()
-                self.busy = False
+                self.summary = DistributionSummary(self.data)
                 self.current_stage = "distributions"
                 self.draw_fig()
             except ValueError as e:
                 print(e)
+                self.error = str(e)
+            finally:
+                self.busy = False
+
+    def overview_click(self):
+        if self.current_stage == 0 or self.busy:
+            return
+        if self.data.get_distributions() is False:
+            return
+        try:
+            if self.summary is None:
+                self.summary = DistributionSummary(self.data)
+            self.current_stage = "overview"
+            self.draw_fig()
+        except ValueError as e:
+            print(e)
+            self.error = str(e)
 
     def binarize_click(self):
         if self.current_stage == 0 or self.busy:
@@ -209,11 +247,13 @@ class Controller(object):
                     if i > checkpoint:
                         checkpoint += 0.1
                         self.view.update()
-                self.busy = False
                 self.current_stage = "binarized"
                 self.draw_fig()
             except ValueError as e:
                 print(e)
+                self.error = str(e)
+            finally:
+                self.busy = False
 
     def previous_click(self):
         if self.current_stage == 0:
@@ -238,6 +278,7 @@ class Controller(object):
             self.data.exclude(self.current_number)
         except ValueError as e:
             print(e)
+            self.error = str(e)
         self.draw_fig()
 
     def unexclude_click(self):
@@ -247,6 +288,7 @@ class Controller(object):
             self.data.unexclude(self.current_number)
         except ValueError as e:
             print(e)
+            self.error = str(e)
         self.draw_fig()
 
     def autoexclude_click(self):
@@ -256,9 +298,11 @@ class Controller(object):
             self.busy = True
             for _ in self.data.autoexclude():
                 pass
-            self.busy = False
         except ValueError as e:
             print(e)
+            self.error = str(e)
+        finally:
+            self.busy = False
         self.draw_fig()
 
     def autolimit_click(self):
@@ -274,31 +318,31 @@ class Controller(object):
                 if i > checkpoint:
                     checkpoint += 0.02
                     self.view.update()
-            self.busy = False
         except ValueError as e:
             print(e)
+            self.error = str(e)
+        finally:
+            self.busy = False
         self.draw_fig()
 
-    def __get_fig(self):
-        if self.current_stage == "imported":
-            fig, (ax1, ax2) = plt.subplots(2, sharex=True, tight_layout=True)
-            self.data.plot(ax1, self.current_number, plots=("mean"))
+    def get_fig(self, stage, cell):
+        if stage == "imported":
+            fig = Figure(tight_layout=True)
+            ax1, ax2 = fig.subplots(2, sharex=True)
+            self.data.plot(ax1, cell, plots=("mean"))
             ax1.set_xlabel(None)
-            self.data.plot(
-                ax2, self.current_number, plots=("raw"), protocol=False
-                )
+            self.data.plot(ax2, cell, plots=("raw"), protocol=False)
             return fig
-        elif self.current_stage == "filtered":
-            fig, (ax1, ax2) = plt.subplots(2, sharex=True, tight_layout=True)
+        elif stage == "filtered":
+            fig = Figure(tight_layout=True)
+            ax1, ax2 = fig.subplots(2, sharex=True)
             fig.suptitle("Filtered data")
-            self.data.plot(ax1, self.current_number, plots=("raw",))
+            self.data.plot(ax1, cell, plots=("raw",))
             ax1.set_xlabel(None)
-            self.data.plot(
-                ax2, self.current_number, plots=("fast",), protocol=False
-                )
+            self.data.plot(ax2, cell, plots=("fast",), protocol=False)
             return fig
-        elif self.current_stage == "distributions":
-            fig = plt.figure(tight_layout=True)
+        elif stage == "distributions":
+            fig = Figure(tight_layout=True)
 
             gs = fig.add_gridspec(2, 3,  width_ratios=(1, 8, 1),
                                   wspace=0, hspace=0
@@ -310,14 +354,12 @@ class Controller(object):
             ax_right = fig.add_subplot(gs[1, 2], sharey=ax_middle)
 
             # plots
-            self.data.plot(ax, self.current_number, "raw")
-            self.data.plot(ax_middle, self.current_number, ["fast"],
+            self.data.plot(ax, cell, "raw")
+            self.data.plot(ax_middle, cell, ["fast"],
                            protocol=False, noise=True
                            )
-            self.data.plot_distributions(ax_left, self.current_number)
-            self.data.plot_distributions(ax_right, self.current_number,
-                                         "signal"
-                                         )
+            self.summary.plot_noise(ax_left, cell)
+            self.summary.plot_signal(ax_right, cell)
 
             # no labels
             ax.tick_params(axis="x", labelbottom=False)
@@ -329,27 +371,48 @@ class Controller(object):
             ax_middle.set_ylabel(None)
             ax_left.set_ylabel("Amplitude")
             return fig
-        elif self.current_stage == "binarized":
-            fig, (ax1, ax2) = plt.subplots(2, sharex=True)
+        elif stage == "overview":
+            fig = Figure(tight_layout=True)
+            ax1, ax2 = fig.subplots(2)
+            fig.suptitle("Distributions of all cells")
+            self.summary.plot_overview(ax1, ax2, cell,
+                                       self.data.get_good_cells()
+                                       )
+            return fig
+        elif stage == "binarized":
+            fig = Figure()
+            ax1, ax2 = fig.subplots(2, sharex=True)
             fig.suptitle("Binarized data")
-            self.data.plot(
-                ax1, self.current_number, plots=("raw")
-                )
+            self.data.plot(ax1, cell, plots=("raw"))
             ax1.set_xlabel(None)
             self.data.plot(
-                ax2, self.current_number, plots=("fast", "bin_fast"),
-                protocol=False
+                ax2, cell, plots=("fast", "bin_fast"), protocol=False
                 )
             return fig
 
-    def draw_fig(self):
+    def is_available(self, stage):
         if self.current_stage == 0:
+            return False
+        elif stage == "imported":
+            return True
+        elif stage == "filtered":
+            return self.data.get_filtered_fast() is not False
+        elif stage in ("distributions", "overview"):
+            return self.summary is not None
+        elif stage == "binarized":
+            return self.data.get_binarized_fast() is not False
+        return False
+
+    def draw_fig(self):
+        if self.current_stage == 0 or not self.drawing:
             return
-        plt.close()
-        self.view.draw_fig(self.__get_fig())
+        self.view.draw_fig(self.get_fig(self.current_stage,
+                                        self.current_number
+                                        ))
 
     def apply_parameters_click(self):
         self.data.reset_computations()
+        self.summary = None
         self.current_stage = "imported"
         new_settings = self.__get_values(self.view.entries)
         self.data.import_settings(new_settings)
@@ -0,0 +1,292 @@
+import io
+import json
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from langerhansGUI.controller import Controller
+
+STAGES = ("imported", "filtered", "distributions", "overview", "binarized")
+
+
+class HeadlessView(object):
+    """
+    Stand-in for the Tk View, so that the Controller can run without a
+    display. Files are not chosen in a dialog but set in advance.
+    """
+
+    def __init__(self):
+        self.controller = None
+        self.filename = None
+        self.progress = 0
+
+    def register(self, controller):
+        self.controller = controller
+
+    def open_file(self):
+        filename, self.filename = self.filename, None
+        return filename
+
+    def save_as(self, extension):
+        return None
+
+    def update_progressbar(self, i):
+        self.progress = i
+
+    def update(self):
+        pass
+
+    def draw_fig(self, fig):
+        pass
+
+
+class RenderService(object):
+    """
+    Renders PNG images of any (stage, cell) pair with the Controller logic.
+
+    Figures are built while holding a lock on the data and rasterized in a
+    thread pool. Results are kept in a bounded cache of futures, so that
+    concurrent requests for the same image share a single render.
+    """
+
+    def __init__(self, data, workers=4, cache_size=256, dpi=100):
+        self.view = HeadlessView()
+        self.controller = Controller(data, self.view, drawing=False)
+        self.dpi = dpi
+
+        self.lock = threading.RLock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_lock = threading.Lock()
+
+# ------------------------------ Data methods ------------------------------- #
+
+    def import_data(self, filename):
+        self.__import(filename, self.controller.import_data)
+
+    def import_settings(self, filename):
+        self.__import(filename, self.controller.import_settings)
+
+    def import_object(self, filename):
+        self.__import(filename, self.controller.import_object)
+
+    def __import(self, filename, method):
+        with self.lock:
+            self.view.filename = filename
+            self.__call(method)
+
+    def exclude(self, cell):
+        with self.lock:
+            cell = self.__check_cell(cell)
+            self.controller.data.exclude(cell)
+            self.clear_cache(cell)
+
+    def unexclude(self, cell):
+        with self.lock:
+            cell = self.__check_cell(cell)
+            self.controller.data.unexclude(cell)
+            self.clear_cache(cell)
+
+    def trigger(self, stage):
+        triggers = {
+            "filtered": self.controller.filter_click,
+            "distributions": self.controller.distributions_click,
+            "overview": self.controller.overview_click,
+            "binarized": self.controller.binarize_click,
+            "autoexclude": self.controller.autoexclude_click,
+            "autolimit": self.controller.autolimit_click
+            }
+        if stage not in triggers:
+            raise ValueError("Unknown stage: {}.".format(stage))
+        with self.lock:
+            if self.controller.current_stage == 0:
+                raise ValueError("No data.")
+            self.__call(triggers[stage])
+            if stage in STAGES and not self.controller.is_available(stage):
+                raise ValueError("Could not compute {}.".format(stage))
+
+    def __call(self, method):
+        # Controller methods print errors instead of raising them
+        self.controller.error = None
+        try:
+            method()
+        finally:
+            self.clear_cache()
+        if self.controller.error is not None:
+            raise ValueError(self.controller.error)
+
+    def status(self):
+        data = self.controller.data
+        status = {"stage": self.controller.current_stage or None,
+                  "busy": self.controller.busy,
+                  "progress": self.view.progress,
+                  "cells": 0,
+                  "good_cells": None,
+                  "stages": []
+                  }
+        if self.controller.current_stage != 0:
+            good_cells = data.get_good_cells()
+            status["cells"] = int(data.get_cells())
+            if good_cells is not False:
+                status["good_cells"] = [bool(i) for i in good_cells]
+            status["stages"] = [stage for stage in STAGES
+                                if self.controller.is_available(stage)
+                                ]
+        return status
+
+# ----------------------------- Render methods ------------------------------ #
+
+    def render(self, stage, cell):
+        if stage not in STAGES:
+            raise ValueError("Unknown stage: {}.".format(stage))
+        cell = self.__check_cell(cell)
+        if not self.controller.is_available(stage):
+            raise ValueError("Stage {} not computed.".format(stage))
+
+        key = (stage, cell)
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                future = self.cache[key]
+            else:
+                future = self.executor.submit(self.__render, stage, cell)
+                self.cache[key] = future
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        try:
+            return future.result()
+        except Exception:
+            with self.cache_lock:
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+            raise
+
+    def __render(self, stage, cell):
+        with self.lock:
+            fig = self.controller.get_fig(stage, cell)
+        FigureCanvasAgg(fig)
+        output = io.BytesIO()
+        fig.savefig(output, format="png", dpi=self.dpi)
+        return output.getvalue()
+
+    def clear_cache(self, cell=None):
+        with self.cache_lock:
+            if cell is None:
+                self.cache.clear()
+                return
+            for key in list(self.cache):
+                if key[1] == cell or key[0] == "overview":
+                    del self.cache[key]
+
+    def __check_cell(self, cell):
+        if self.controller.current_stage == 0:
+            raise ValueError("No data.")
+        cell = int(cell)
+        if not 0 <= cell < self.controller.data.get_cells():
+            raise ValueError("Cell {} out of range.".format(cell))
+        return cell
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /status                   JSON with stage, cells and excluded cells
+    GET  /render/<stage>/<cell>    PNG image
+    POST /exclude/<cell>
+    POST /unexclude/<cell>
+    POST /stage/<stage>            compute stage (or autoexclude, autolimit)
+    """
+
+    def do_GET(self):
+        path = self.path.strip("/").split("/")
+        service = self.server.service
+        try:
+            if path == ["status"]:
+                self.__send_json(service.status())
+            elif len(path) == 3 and path[0] == "render":
+                cell = path[2][:-4] if path[2].endswith(".png") else path[2]
+                image = service.render(path[1], cell)
+                self.__send(200, "image/png", image)
+            else:
+                self.__send_json({"error": "Not found."}, 404)
+        except ValueError as e:
+            self.__send_json({"error": str(e)}, 400)
+        except Exception as e:
+            self.__send_json({"error": str(e)}, 500)
+
+    def do_POST(self):
+        path = self.path.strip("/").split("/")
+        service = self.server.service
+        try:
+            if len(path) != 2:
+                self.__send_json({"error": "Not found."}, 404)
+            elif path[0] == "exclude":
+                service.exclude(path[1])
+                self.__send_json(service.status())
+            elif path[0] == "unexclude":
+                service.unexclude(path[1])
+                self.__send_json(service.status())
+            elif path[0] == "stage":
+                service.trigger(path[1])
+                self.__send_json(service.status())
+            else:
+                self.__send_json({"error": "Not found."}, 404)
+        except ValueError as e:
+            self.__send_json({"error": str(e)}, 400)
+        except Exception as e:
+            self.__send_json({"error": str(e)}, 500)
+
+    def __send_json(self, content, code=200):
+        self.__send(code, "application/json", json.dumps(content).encode())
+
+    def __send(self, code, content_type, body):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(service, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.service = service
+    return server
+
+
+def run():
+    from langerhans import Data
+
+    parser = argparse.ArgumentParser(
+        description="Serve rendered images of cells over HTTP."
+        )
+    parser.add_argument("file", help="data matrix or pickle object (.pkl)")
+    parser.add_argument("--settings", help="YAML settings file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    service = RenderService(Data(), workers=args.workers)
+    if args.file.endswith(".pkl"):
+        service.import_object(args.file)
+    else:
+        service.import_data(args.file)
+    if args.settings is not None:
+        service.import_settings(args.settings)
+
+    server = serve(service, args.host, args.port)
+    print("Serving on http://{}:{}/".format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
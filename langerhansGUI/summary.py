@@ -0,0 +1,167 @@
+import numpy as np
+
+EXCLUDE_COLOR = 'xkcd:salmon'
+BAND_COLOR = 'lightgrey'
+
+NOISE_BINS = 20
+SPIKES_BINS = 100
+CURVE_POINTS = 50
+
+
+class DistributionSummary(object):
+    """
+    Per-cell noise and signal distributions, prepared for all cells at once.
+
+    Parameters (skew, mean, std) are taken from the distributions computed by
+    the langerhans package. Histograms are counted in one pass over the
+    cells x frames matrix and stored as count matrices (cells x bins) with the
+    lower and upper edge of each row, together with the normal density of the
+    fitted noise parameters, so drawing a cell only plots cached values.
+    Rows without values have a NaN range and are not drawn.
+    """
+
+    def __init__(self, data):
+        distributions = data.get_distributions()
+        if distributions is False:
+            raise ValueError("No distribution data.")
+        filtered_fast = data.get_filtered_fast()
+        if filtered_fast is False:
+            raise ValueError("No filtered data.")
+
+        signal = np.asarray(filtered_fast, dtype=float)
+        stimulation = int(data.get_settings()["Stimulation [frame]"][0])
+        if not 0 < stimulation < signal.shape[1]:
+            raise ValueError(
+                "Stimulation frame {} is not inside the recording of {} "
+                "frames.".format(stimulation, signal.shape[1])
+                )
+
+        peak = np.max(np.abs(signal), axis=1, keepdims=True)
+        signal = signal/np.where(peak == 0, 1, peak)
+        noise = signal[:, :stimulation]
+        spikes = signal[:, stimulation:]
+
+        # Remove outliers of noise
+        q1, q3 = np.quantile(noise, (0.25, 0.75), axis=1, keepdims=True)
+        iqr = q3 - q1
+        noise_mask = np.logical_and(noise > q1-1.5*iqr, noise < q3+1.5*iqr)
+        spikes_mask = np.ones(spikes.shape, dtype=bool)
+
+        # Cells without any signal have no distributions to draw
+        silent = peak[:, 0] == 0
+        noise_mask[silent] = False
+        spikes_mask[silent] = False
+
+        self.cells = signal.shape[0]
+        self.noise_params = np.array(
+            [cell["noise_params"] for cell in distributions], dtype=np.float32
+            )
+        self.spikes_params = np.array(
+            [cell["spikes_params"] for cell in distributions], dtype=np.float32
+            )
+        self.noise_hist, self.noise_range = self.__histograms(
+            noise, noise_mask, NOISE_BINS
+            )
+        self.spikes_hist, self.spikes_range = self.__histograms(
+            spikes, spikes_mask, SPIKES_BINS
+            )
+        self.noise_curve = self.__normal_curves(
+            self.noise_params, self.noise_range, noise_mask.sum(axis=1)
+            )
+
+    def __histograms(self, values, mask, bins):
+        empty = np.logical_not(mask.any(axis=1))
+        lower = np.where(mask, values, np.inf).min(axis=1)
+        upper = np.where(mask, values, -np.inf).max(axis=1)
+        lower[empty] = 0
+        upper[empty] = 0
+        # Same convention as np.histogram for a degenerate range
+        flat = lower == upper
+        lower[flat] -= 0.5
+        upper[flat] += 0.5
+
+        width = (upper - lower)[:, np.newaxis]
+        index = ((values - lower[:, np.newaxis])/width*bins).astype(int)
+        index = np.clip(index, 0, bins-1)
+        index += bins*np.arange(values.shape[0])[:, np.newaxis]
+
+        counts = np.bincount(index[mask], minlength=values.shape[0]*bins)
+        counts = counts.reshape(values.shape[0], bins).astype(np.uint32)
+        edges = np.column_stack((lower, upper)).astype(np.float32)
+        edges[empty] = np.nan
+        return counts, edges
+
+    def __normal_curves(self, params, edges, counts):
+        # Normal density of (mean, std) on each row's range, scaled to counts
+        mean = params[:, 1, np.newaxis]
+        std = params[:, 2, np.newaxis]
+        x = np.linspace(edges[:, 0], edges[:, 1], CURVE_POINTS, axis=1)
+        bin_width = (edges[:, 1] - edges[:, 0])/NOISE_BINS
+        scale = (counts*bin_width)[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = np.exp(-0.5*((x-mean)/std)**2)/(std*np.sqrt(2*np.pi))
+        return (scale*density).astype(np.float32)
+
+# ----------------------------- Plotting methods ---------------------------- #
+
+    def plot_noise(self, ax, cell):
+        edges = self.noise_range[cell]
+        if np.isnan(edges[0]):
+            return
+        self.__plot_hist(ax, self.noise_hist[cell], edges)
+        curve = self.noise_curve[cell]
+        if np.all(np.isfinite(curve)):
+            ax.plot(curve, np.linspace(edges[0], edges[1], len(curve)),
+                    c="k", lw=0.8
+                    )
+        skew, mean, std = self.noise_params[cell]
+        ax.axhline(mean, c="k")
+        ax.axhspan(mean-std, mean+std, alpha=0.5, color=BAND_COLOR)
+        ax.set_title("STD: {:.2f}".format(std), fontsize="small")
+
+    def plot_signal(self, ax, cell):
+        edges = self.spikes_range[cell]
+        if np.isnan(edges[0]):
+            return
+        self.__plot_hist(ax, self.spikes_hist[cell], edges)
+        skew, mean, std = self.spikes_params[cell]
+        ax.axhline(mean, c="k")
+        ax.axhline(std, c="k", ls="--")
+        ax.set_title("Skew: {:.2f}".format(skew), fontsize="small")
+
+    def __plot_hist(self, ax, counts, edges):
+        bins = np.linspace(edges[0], edges[1], len(counts)+1)
+        ax.barh(bins[:-1], counts, bins[1]-bins[0], align="edge",
+                color="grey"
+                )
+
+    def plot_overview(self, ax1, ax2, cell, good_cells=False):
+        noise_std = self.noise_params[:, 2]
+        spikes_skew = self.spikes_params[:, 0]
+
+        colors = np.full(self.cells, "grey", dtype=object)
+        if good_cells is not False:
+            colors[np.logical_not(good_cells)] = EXCLUDE_COLOR
+        colors[cell] = "C0"
+
+        # Noise level ranking
+        order = np.argsort(noise_std)[::-1]
+        ax1.bar(np.arange(self.cells), noise_std[order], 1,
+                color=colors[order]
+                )
+        if self.cells <= 50:
+            ax1.set_xticks(np.arange(self.cells))
+            ax1.set_xticklabels(order, fontsize="x-small", rotation=90)
+        else:
+            ax1.set_xticks([])
+        ax1.set_xlim(-0.5, self.cells-0.5)
+        ax1.set_xlabel("Cells (ranked)")
+        ax1.set_ylabel("Noise STD")
+
+        # Noise level against signal skewness
+        ax2.scatter(noise_std, spikes_skew, c=list(colors), s=12)
+        ax2.annotate(str(cell), (noise_std[cell], spikes_skew[cell]),
+                     textcoords="offset points", xytext=(4, 4), color="C0"
+                     )
+        ax2.set_xlabel("Noise STD")
+        ax2.set_ylabel("Signal skew")
@@ -106,6 +106,12 @@ class View(tk.Tk):
                                )
         dst_button.pack(side=tk.LEFT)
 
+        ovr_button = tk.Button(topframe, highlightbackground=BG,
+                               text="Overview",
+                               command=self.controller.overview_click
+                               )
+        ovr_button.pack(side=tk.LEFT)
+
         bin_button = tk.Button(topframe, highlightbackground=BG,
                                text="Binarize",
                                command=self.controller.binarize_click
@@ -11,6 +11,7 @@ setup(
       entry_points = {
             'console_scripts': [
                   'langui = langerhansGUI.run:run',
+                  'langui-server = langerhansGUI.server:run',
             ]
       },
       install_requires = ['langerhans', 'pyyaml', 'numpy', 'scipy']
@@ -0,0 +1,168 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pytest
+
+from langerhansGUI.server import RenderService, serve
+
+CELLS = 4
+FRAMES = 300
+STIMULATION = 100
+
+
+class StubData(object):
+    """Minimal stand-in for langerhans.Data."""
+
+    def __init__(self):
+        self.signal = False
+        self.filtered = False
+        self.distributions = False
+        self.good_cells = False
+
+    def import_data(self, signal):
+        self.signal = signal
+        self.good_cells = np.ones(len(signal), dtype=bool)
+
+    def reset_computations(self):
+        self.filtered = False
+        self.distributions = False
+
+    def get_cells(self): return len(self.signal)
+    def get_settings(self): return {"Stimulation [frame]": [STIMULATION]}
+    def get_good_cells(self): return self.good_cells
+    def get_filtered_slow(self): return self.filtered
+    def get_filtered_fast(self): return self.filtered
+    def get_distributions(self): return self.distributions
+    def get_binarized_slow(self): return False
+    def get_binarized_fast(self): return False
+
+    def filter(self):
+        self.filtered = self.signal.copy()
+        yield 1
+
+    def compute_distributions(self):
+        if self.filtered is False:
+            raise ValueError("No filtered data.")
+        self.distributions = []
+        for cell in self.filtered:
+            cell = cell/np.max(np.abs(cell))
+            noise, spikes = cell[:STIMULATION], cell[STIMULATION:]
+            self.distributions.append({
+                "noise_params": (0, np.mean(noise), np.std(noise)),
+                "spikes_params": (0, np.mean(spikes), np.std(spikes))
+                })
+        yield 1
+
+    def exclude(self, i): self.good_cells[i] = False
+    def unexclude(self, i): self.good_cells[i] = True
+
+    def plot(self, ax, cell, plots=("raw",), protocol=True, noise=False):
+        ax.plot(self.signal[cell])
+
+
+@pytest.fixture
+def service(tmp_path):
+    filename = str(tmp_path / "data.txt")
+    np.savetxt(filename, np.random.default_rng(0).normal(
+        size=(CELLS, FRAMES)
+        ))
+    service = RenderService(StubData(), workers=2)
+    service.import_data(filename)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def url(service):
+    server = serve(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    with urlopen(url) as response:
+        return response.read()
+
+
+def post(url):
+    with urlopen(Request(url, method="POST")) as response:
+        return json.loads(response.read())
+
+
+def error(method, url):
+    with pytest.raises(HTTPError) as e:
+        method(url)
+    return e.value.code, json.loads(e.value.read())["error"]
+
+
+def test_status(url):
+    status = json.loads(get(url + "/status"))
+    assert status["stage"] == "imported"
+    assert status["cells"] == CELLS
+    assert status["stages"] == ["imported"]
+
+
+def test_render_png(url):
+    post(url + "/stage/filtered")
+    assert get(url + "/render/filtered/0.png").startswith(b"\x89PNG")
+
+
+def test_render_stage_not_computed(url):
+    assert error(get, url + "/render/filtered/0")[0] == 400
+
+
+def test_render_cell_out_of_range(url):
+    assert error(get, url + "/render/imported/{}".format(CELLS))[0] == 400
+
+
+def test_failed_stage_reports_error(url):
+    code, message = error(post, url + "/stage/distributions")
+    assert code == 400
+    assert message == "No filtered data."
+    assert json.loads(get(url + "/status"))["busy"] is False
+
+
+def test_exclude_clears_cache(service, url):
+    post(url + "/stage/filtered")
+    post(url + "/stage/distributions")
+    for path in ("distributions/1", "distributions/2", "overview/2"):
+        get(url + "/render/" + path)
+
+    status = post(url + "/exclude/1")
+    assert status["good_cells"][1] is False
+    assert set(service.cache) == {("distributions", 2)}
+
+
+def test_concurrent_requests_share_future(service, url):
+    submitted = []
+    submit = service.executor.submit
+
+    def counting_submit(*args):
+        submitted.append(args)
+        return submit(*args)
+
+    service.executor.submit = counting_submit
+    barrier = threading.Barrier(8)
+    images = []
+
+    def request():
+        barrier.wait()
+        images.append(get(url + "/render/imported/0"))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(submitted) == 1
+    assert len(images) == 8
+    assert len(set(images)) == 1
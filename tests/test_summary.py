@@ -0,0 +1,139 @@
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import numpy as np
+import pytest
+
+from langerhansGUI.summary import (DistributionSummary, NOISE_BINS,
+                                   SPIKES_BINS
+                                   )
+
+CELLS = 8
+FRAMES = 500
+STIMULATION = 200
+SILENT = 5
+CONSTANT = 6
+
+
+class StubData(object):
+    """Minimal stand-in for langerhans.Data after compute_distributions."""
+
+    def __init__(self, signal, stimulation=STIMULATION):
+        self.signal = signal
+        self.stimulation = stimulation
+
+    def get_settings(self):
+        return {"Stimulation [frame]": [self.stimulation]}
+
+    def get_filtered_fast(self):
+        return self.signal
+
+    def get_distributions(self):
+        distributions = []
+        for cell in self.signal:
+            noise, spikes = split(cell)
+            distributions.append({
+                "noise_params": params(noise),
+                "spikes_params": params(spikes)
+                })
+        return distributions
+
+
+def params(values):
+    if len(values) == 0:
+        return (np.nan, np.nan, np.nan)
+    return (0, np.mean(values), np.std(values))
+
+
+def split(cell):
+    # Normalisation and outlier removal of compute_distributions
+    peak = np.max(np.abs(cell))
+    cell = cell/(peak if peak else 1)
+    noise, spikes = cell[:STIMULATION], cell[STIMULATION:]
+    q1, q3 = np.quantile(noise, (0.25, 0.75))
+    iqr = q3 - q1
+    noise = noise[np.logical_and(noise > q1-1.5*iqr, noise < q3+1.5*iqr)]
+    return noise, spikes
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=(CELLS, FRAMES))
+    signal[:, STIMULATION:] += rng.exponential(
+        size=(CELLS, FRAMES-STIMULATION)
+        )
+    signal[SILENT] = 0
+    signal[CONSTANT] = 2
+    return signal
+
+
+@pytest.fixture
+def summary(signal):
+    return DistributionSummary(StubData(signal))
+
+
+def test_histograms_match_numpy(signal, summary):
+    for cell in range(CELLS):
+        if cell in (SILENT, CONSTANT):
+            continue
+        noise, spikes = split(signal[cell])
+        for values, bins, counts, edges in (
+                (noise, NOISE_BINS, summary.noise_hist, summary.noise_range),
+                (spikes, SPIKES_BINS, summary.spikes_hist,
+                 summary.spikes_range)
+                ):
+            hist, bin_edges = np.histogram(values, bins)
+            np.testing.assert_array_equal(counts[cell], hist)
+            np.testing.assert_allclose(edges[cell],
+                                       (bin_edges[0], bin_edges[-1]),
+                                       rtol=1e-6
+                                       )
+
+
+def test_flat_signal_is_padded(signal, summary):
+    noise, spikes = split(signal[CONSTANT])
+    hist, bin_edges = np.histogram(spikes, SPIKES_BINS)
+    np.testing.assert_array_equal(summary.spikes_hist[CONSTANT], hist)
+    np.testing.assert_allclose(summary.spikes_range[CONSTANT], (0.5, 1.5))
+    # No noise values are left after outlier removal
+    assert np.all(np.isnan(summary.noise_range[CONSTANT]))
+
+
+def test_silent_cell_is_not_drawn(summary):
+    assert np.all(np.isnan(summary.noise_range[SILENT]))
+    assert np.all(np.isnan(summary.spikes_range[SILENT]))
+    assert summary.noise_hist[SILENT].sum() == 0
+    assert summary.spikes_hist[SILENT].sum() == 0
+
+    ax1, ax2 = Figure().subplots(1, 2)
+    summary.plot_noise(ax1, SILENT)
+    summary.plot_signal(ax2, SILENT)
+    for ax in (ax1, ax2):
+        assert not ax.patches and not ax.lines
+
+
+def test_noise_curve_scaled_to_counts(summary):
+    cell = 0
+    lower, upper = summary.noise_range[cell]
+    bin_width = (upper - lower)/NOISE_BINS
+    curve = summary.noise_curve[cell]
+    dx = (upper - lower)/(len(curve) - 1)
+    area = np.sum((curve[1:] + curve[:-1])/2)*dx/bin_width
+    # Noise without outliers lies almost entirely inside the fitted density
+    assert area == pytest.approx(summary.noise_hist[cell].sum(), rel=0.05)
+
+
+@pytest.mark.parametrize("stimulation", (0, FRAMES, FRAMES+100))
+def test_stimulation_outside_recording(signal, stimulation):
+    with pytest.raises(ValueError):
+        DistributionSummary(StubData(signal, stimulation))
+
+
+def test_plot_overview(summary):
+    good_cells = np.ones(CELLS, dtype=bool)
+    good_cells[[1, 3]] = False
+    ax1, ax2 = Figure().subplots(2)
+    summary.plot_overview(ax1, ax2, 2, good_cells)
+    assert len(ax1.patches) == CELLS
+    assert len(ax2.collections) == 1